@@ -26,13 +26,38 @@ from src.ui.quota_request import (
     check_quota_request_status,
     get_request_history_files
 )
-from src.ui.formatting import add_row_numbers, highlight_differences
+from src.ui.formatting import add_row_numbers, highlight_differences, QUOTA_EDITOR_COLUMN_CONFIG
 
 # IMPORTANT: set_page_config must be the first Streamlit command
 st.set_page_config(
     page_title="AWS Service Quotas Comparison", page_icon="☁️", layout="wide"
 )
 
+def _render_quota_form(edited_df, button_label, callback):
+    """Render the quota selection form with a select/deselect all toggle."""
+    selected_quotas_count = edited_df["Request Increase"].sum()
+    st.write(f'Going to submit quotas for {selected_quotas_count}')
+    with st.container():
+        st.button(button_label, on_click=callback)
+    with st.form("quota_increase_form", clear_on_submit=False):
+        # Display table with checkboxes
+        st.data_editor(
+            data=edited_df,
+            hide_index=True,
+            use_container_width=True,
+            key="quota_editor",
+            column_config=QUOTA_EDITOR_COLUMN_CONFIG,
+        )
+
+        # Update session state with edited values
+        st.session_state.edited_df = edited_df
+
+        # Submit button for batch processing
+        st.form_submit_button(
+            "Submit Quota Increase Requests",
+            on_click=bt_callback
+        )
+
 def main():
     """Main application function."""
     logger.info("Starting main application function")
@@ -104,125 +129,19 @@ def main():
         help="Enable cache if you want to use the cached files for the selected profile...",
     )
 
-    # Handle selected_all state
-    if "selected_all" in st.session_state and "edited_df" in st.session_state:
-        if st.session_state.selected_all:
-            dest_profile = st.session_state.dest
-            dest_region = st.session_state.dest_region
-            edited_df = st.session_state.edited_df
-            selected_quotas_count = edited_df["Request Increase"].sum()
-            st.write(f'Going to submit quotas for {selected_quotas_count}')
-            with st.container():
-                st.button("Deselect All", on_click=deselect_all_callback)
-            with st.form("quota_increase_form", clear_on_submit=False):
-                # Display table with checkboxes
-                st.data_editor(
-                    data=edited_df,
-                    hide_index=True,
-                    use_container_width=True,
-                    key="quota_editor",
-                    column_config={
-                        "#": st.column_config.NumberColumn(
-                            "Row",
-                            help="Row number",
-                            disabled=True,
-                            width="small",
-                        ),
-                        "Request Increase": st.column_config.CheckboxColumn(
-                            "Select",
-                            help="Select to request quota increase",
-                            width="small",
-                        ),
-                        "Service": st.column_config.TextColumn(
-                            "Service", disabled=True
-                        ),
-                        "Quota Name": st.column_config.TextColumn(
-                            "Quota Name", disabled=True
-                        ),
-                        "Source Value": st.column_config.NumberColumn(
-                            "Source Value", disabled=True
-                        ),
-                        "Destination Value": st.column_config.NumberColumn(
-                            "Destination Value", disabled=True
-                        ),
-                        "Delta": st.column_config.NumberColumn(
-                            "Delta", disabled=True
-                        ),
-                        "Adjustable": st.column_config.TextColumn(
-                            "Adjustable", disabled=True
-                        ),
-                    },
-                )
-
-                # Update session state with edited values
-                st.session_state.edited_df = edited_df
-
-                # Submit button for batch processing
-                st.form_submit_button(
-                    "Submit Quota Increase Requests",
-                    on_click=bt_callback
-                )
-            st.session_state.selected_all=False
-    
-    # Handle deselected_all state
-    if "deselected_all" in st.session_state and "edited_df" in st.session_state:
-        if st.session_state.deselected_all:
-            dest_profile = st.session_state.dest
-            dest_region = st.session_state.dest_region
-            edited_df = st.session_state.edited_df
-            selected_quotas_count = edited_df["Request Increase"].sum()
-            st.write(f'Going to submit quotas for {selected_quotas_count}')
-            with st.container():
-                st.button("Select All", on_click=select_all_callback)
-            with st.form("quota_increase_form", clear_on_submit=False):
-                # Display table with checkboxes
-                st.data_editor(
-                    data=edited_df,
-                    hide_index=True,
-                    use_container_width=True,
-                    key="quota_editor",
-                    column_config={
-                        "#": st.column_config.NumberColumn(
-                            "Row",
-                            help="Row number",
-                            disabled=True,
-                            width="small",
-                        ),
-                        "Request Increase": st.column_config.CheckboxColumn(
-                            "Select",
-                            help="Select to request quota increase",
-                            width="small",
-                        ),
-                        "Service": st.column_config.TextColumn(
-                            "Service", disabled=True
-                        ),
-                        "Quota Name": st.column_config.TextColumn(
-                            "Quota Name", disabled=True
-                        ),
-                        "Source Value": st.column_config.NumberColumn(
-                            "Source Value", disabled=True
-                        ),
-                        "Destination Value": st.column_config.NumberColumn(
-                            "Destination Value", disabled=True
-                        ),
-                        "Delta": st.column_config.NumberColumn(
-                            "Delta", disabled=True
-                        ),
-                        "Adjustable": st.column_config.TextColumn(
-                            "Adjustable", disabled=True
-                        ),
-                    },
-                )
-
-                # Update session state with edited values
-                st.session_state.edited_df = edited_df
-
-                # Submit button for batch processing
-                st.form_submit_button(
-                    "Submit Quota Increase Requests",
-                    on_click=bt_callback
-                )
-            st.session_state.deselected_all=False
+    # Handle selected_all / deselected_all state
+    selected_all = st.session_state.get("selected_all")
+    deselected_all = st.session_state.get("deselected_all")
+    if "edited_df" in st.session_state and (selected_all or deselected_all):
+        # Reset both flags before rendering so only one form is registered per run
+        st.session_state.selected_all = False
+        st.session_state.deselected_all = False
+        dest_profile = st.session_state.dest
+        dest_region = st.session_state.dest_region
+        if selected_all:
+            _render_quota_form(st.session_state.edited_df, "Deselect All", deselect_all_callback)
+        else:
+            _render_quota_form(st.session_state.edited_df, "Select All", select_all_callback)
 
     # Handle selected_request_id state
     if "selected_request_id" in st.session_state:
@@ -235,32 +154,40 @@ def main():
         edited_df = st.session_state.edited_df
         edited_rows_session = st.session_state.quota_editor['edited_rows']
         
-        # First, explicitly convert the column to boolean type
+        # Map editor row positions to actual row labels, skipping out-of-range rows
+        updates = {
+            edited_df.index[pos_index]: update
+            for pos_index, update in edited_rows_session.items()
+            if pos_index < len(edited_df)
+        }
+        # Apply all edits in one aligned update; unknown columns are ignored
+        edited_df.update(pd.DataFrame.from_dict(updates, orient="index"))
         edited_df["Request Increase"] = edited_df["Request Increase"].astype(bool)
 
-        # Get selected rows
-        for pos_index, update in edited_rows_session.items():
-            if pos_index < len(edited_df):  # Avoid out-of-range
-                actual_index = edited_df.index[pos_index]  # Get actual row index from position
-                for col, val in update.items():
-                    if col in edited_df.columns:
-                        edited_df.at[actual_index, col] = val
-        
-        # Get the selected quotas using boolean indexing
-        selected_quotas = edited_df[edited_df["Request Increase"] == True]
+        # Get the selected quotas using the boolean column as a mask
+        selected_quotas = edited_df.loc[edited_df["Request Increase"]]
         
         # Process quota increase requests
         process_quota_increase_requests(dest_profile, dest_region, selected_quotas)
         
-        # Clear session state after processing
-        st.session_state.clear()
+        # Clear the quota form state after processing; keep profile/region selections
+        for key in (
+            "form_submitted",
+            "edited_df",
+            "quota_editor",
+            "selected_all",
+            "deselected_all",
+            "selected_request_id",
+        ):
+            st.session_state.pop(key, None)
 
     # Compare Quotas button
     if (
         st.button("🔍 Compare Quotas", type="primary")
         and source_profile
         and dest_profile
-        and ("selected_all" or "deselected_all") not in st.session_state
+        and not st.session_state.get("selected_all")
+        and not st.session_state.get("deselected_all")
     ):
         with st.spinner("Fetching and comparing quotas ..."):
             progress_bar = st.progress(0)
@@ -297,12 +224,6 @@ def main():
                 st.markdown(f"- Source: {source_profile} ({source_region})")
                 st.markdown(f"- Destination: {dest_profile} ({dest_region})")
                 
-                # Clear the loading info messages
-                if "info_placeholders" in st.session_state:
-                    for placeholder in st.session_state.info_placeholders:
-                        placeholder.empty()
-                    st.session_state.info_placeholders = []
-                
                 # Display summary metrics
                 display_summary_metrics(df, source_only_df)
 
@@ -313,7 +234,7 @@ def main():
                 st.markdown("### 📋 Quota Comparisons")
                 st.markdown("#### Different Quotas")
 
-                different_df = df[df["Delta"].notna() & (df["Delta"] != 0)].copy()
+                different_df = df[df["Delta"].notna() & (df["Delta"] != 0)]
                 if not different_df.empty:
                     display_quota_selection_interface(different_df)
 
@@ -323,7 +244,9 @@ def main():
     # Get Quota Status button
     elif (
         st.button("⏰ Get Quota Status", type="primary", help="Check the status of previously submitted quota increase requests")
-        and dest_profile and ("selected_all" or "deselected_all") not in st.session_state
+        and dest_profile
+        and not st.session_state.get("selected_all")
+        and not st.session_state.get("deselected_all")
     ):
         # Create a container for the quota status check interface
         status_container = st.container()
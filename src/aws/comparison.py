@@ -2,145 +2,131 @@
 Functions for comparing AWS service quotas between accounts.
 """
 import pandas as pd
+import streamlit as st
 from typing import Dict, Tuple
 from src.utils.logger import logger
 
+# Fields stored for each quota by fetch_quotas_from_aws
+QUOTA_FIELDS = ["Value", "DefaultValue", "Unit", "Adjustable", "ServiceCode", "QuotaCode"]
+
+COMPARISON_COLUMNS = [
+    "Service",
+    "Quota Name",
+    "Source Value",
+    "Source Default",
+    "Destination Value",
+    "Destination Default",
+    "Unit",
+    "Delta",
+    "Adjustable",
+    "ServiceCode",
+    "QuotaCode"
+]
+
+# Text columns are cast to strings to avoid Arrow conversion issues
+STRING_COLUMNS = ["Service", "Quota Name", "Unit", "Adjustable", "ServiceCode", "QuotaCode"]
+
+SOURCE_ONLY_COLUMNS = [
+    "Service",
+    "Quota Name",
+    "Source Value",
+    "Source Default",
+    "Unit",
+    "Adjustable",
+    "ServiceCode",
+    "QuotaCode"
+]
+
+# Empty results, built once and copied on return
+_EMPTY_COMPARISON_DF = pd.DataFrame(columns=COMPARISON_COLUMNS)
+_EMPTY_SOURCE_ONLY_DF = pd.DataFrame(columns=SOURCE_ONLY_COLUMNS)
+
+def _quotas_to_frame(quotas: Dict) -> pd.DataFrame:
+    """Build a DataFrame indexed by quota key with one column per quota field."""
+    return pd.DataFrame.from_dict(quotas, orient="index").reindex(columns=QUOTA_FIELDS)
+
+@st.cache_data(ttl=600, show_spinner=False)
 def compare_quotas(
     source_quotas: Dict, dest_quotas: Dict, suppress_defaults: bool = False
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Compare quotas between source and destination profiles."""
-    logger.info(f"Comparing quotas between source and destination profiles")
-    logger.info(f"Source quotas count: {len(source_quotas)}")
-    logger.info(f"Destination quotas count: {len(dest_quotas)}")
-    logger.info(f"Suppress defaults: {suppress_defaults}")
-
-    all_quotas = set(source_quotas.keys()) | set(dest_quotas.keys())
-    comparison_data = []
-    source_only_data = []
-
-    # Track unique services in source only
-    source_only_services = set()
-
-    for quota_name in all_quotas:
-        source_quota = source_quotas.get(quota_name, {})
-        dest_quota = dest_quotas.get(quota_name, {})
-
-        service_name = quota_name.split(" - ")[0]
-        quota_name_only = quota_name.split(" - ")[1]
-
-        source_value = source_quota.get("Value", "Not Set")
-        dest_value = dest_quota.get("Value", "Not Set")
-        source_default = source_quota.get("DefaultValue", source_value)
-        dest_default = dest_quota.get("DefaultValue", dest_value)
-
-        unit = source_quota.get("Unit") or dest_quota.get("Unit", "")
-        adjustable = source_quota.get("Adjustable") or dest_quota.get(
-            "Adjustable", False
-        )
-        service_code = source_quota.get("ServiceCode") or dest_quota.get(
-            "ServiceCode", ""
-        )
+    logger.info("Comparing quotas between source and destination profiles")
+    logger.info("Source quotas count: %s", len(source_quotas))
+    logger.info("Destination quotas count: %s", len(dest_quotas))
+    logger.info("Suppress defaults: %s", suppress_defaults)
+
+    if not source_quotas and not dest_quotas:
+        return _EMPTY_COMPARISON_DF.copy(), _EMPTY_SOURCE_ONLY_DF.copy()
+
+    # Align source and destination quotas on their "Service - Quota Name" key
+    merged = _quotas_to_frame(source_quotas).merge(
+        _quotas_to_frame(dest_quotas),
+        left_index=True,
+        right_index=True,
+        how="outer",
+        suffixes=("_src", "_dst"),
+        indicator=True,
+    )
 
-        quota_code = source_quota.get("QuotaCode") or dest_quota.get(
-            "QuotaCode", ""
+    # Numeric values and defaults; a missing default falls back to the value
+    for side in ("_src", "_dst"):
+        merged["Value" + side] = pd.to_numeric(merged["Value" + side], errors="coerce")
+        merged["DefaultValue" + side] = pd.to_numeric(
+            merged["DefaultValue" + side], errors="coerce"
+        ).fillna(merged["Value" + side])
+
+    # Drop quotas where both values are at their defaults before building the
+    # output columns. Source-only quotas are never at the destination default.
+    if suppress_defaults:
+        source_at_default = (merged["_merge"] == "right_only") | (
+            merged["Value_src"] == merged["DefaultValue_src"]
         )
+        dest_at_default = merged["Value_dst"] == merged["DefaultValue_dst"]
+        merged = merged[~(source_at_default & dest_at_default)]
+
+    if merged.empty:
+        return _EMPTY_COMPARISON_DF.copy(), _EMPTY_SOURCE_ONLY_DF.copy()
+
+    # Which side each quota key came from
+    source_missing = merged["_merge"] == "right_only"
+    dest_missing = merged["_merge"] == "left_only"
+
+    # Split "Service - Quota Name" keys once; keys without a separator keep an empty quota name
+    names = merged.index.to_series().str.partition(" - ")
+
+    source_value = merged["Value_src"]
+    dest_value = merged["Value_dst"]
+    adjustable = merged["Adjustable_src"].eq(True) | merged["Adjustable_dst"].eq(True)
+
+    quotas_df = pd.DataFrame(
+        {
+            "Service": names[0],
+            "Quota Name": names[2],
+            "Source Value": source_value,
+            "Source Default": merged["DefaultValue_src"],
+            "Destination Value": dest_value,
+            "Destination Default": merged["DefaultValue_dst"],
+            "Unit": merged["Unit_src"].combine_first(merged["Unit_dst"]).fillna(""),
+            # Already float64, NaN whenever either side is missing
+            "Delta": dest_value - source_value,
+            "Adjustable": adjustable.map({True: "✅", False: "❌"}),
+            "ServiceCode": merged["ServiceCode_src"].combine_first(merged["ServiceCode_dst"]).fillna(""),
+            "QuotaCode": merged["QuotaCode_src"].combine_first(merged["QuotaCode_dst"]).fillna(""),
+        }
+    )
 
-        # Check if quota exists only in source
-        if quota_name in source_quotas and quota_name not in dest_quotas:
-            source_only_services.add(service_name)
-            source_only_data.append(
-                {
-                    "Service": service_name,
-                    "Quota Name": quota_name_only,
-                    "Source Value": source_value,
-                    "Source Default": source_default,
-                    "Unit": unit,
-                    "Adjustable": "✅" if adjustable else "❌",
-                    "ServiceCode": service_code,
-                    "QuotaCode": quota_code
-                }
-            )
-            continue
-
-        # Skip if both values are at their defaults and suppress_defaults is True
-        if (
-            suppress_defaults
-            and source_value == source_default
-            and dest_value == dest_default
-        ):
-            continue
-
-        # Calculate delta only if both values are numeric
-        if isinstance(source_value, (int, float)) and isinstance(
-            dest_value, (int, float)
-        ):
-            delta = dest_value - source_value
-        else:
-            delta = "N/A"
-
-        comparison_data.append(
-            {
-                "Service": service_name,
-                "Quota Name": quota_name_only,
-                "Source Value": source_value,
-                "Source Default": source_default,
-                "Destination Value": dest_value,
-                "Destination Default": dest_default,
-                "Unit": unit,
-                "Delta": delta,
-                "Adjustable": "✅" if adjustable else "❌",
-                "ServiceCode": service_code,
-                "QuotaCode": quota_code
-            }
-        )
+    quotas_df = quotas_df.astype(dict.fromkeys(STRING_COLUMNS, "string"))
 
-    # Create DataFrames
-    comparison_df = (
-        pd.DataFrame(comparison_data)
-        if comparison_data
-        else pd.DataFrame(
-            columns=[
-                "Service",
-                "Quota Name",
-                "Source Value",
-                "Source Default",
-                "Destination Value",
-                "Destination Default",
-                "Unit",
-                "Delta",
-                "Adjustable",
-                "ServiceCode",
-                "QuotaCode"
-            ]
-        )
-    )
+    # Quotas that exist only in source
+    source_only_df = quotas_df.loc[dest_missing, SOURCE_ONLY_COLUMNS].reset_index(drop=True)
 
-    # Convert numeric columns to strings to avoid Arrow conversion issues
-    for col in comparison_df.select_dtypes(include='object').columns:
-        comparison_df[col] = comparison_df[col].astype('string')
-    
-    source_only_df = (
-        pd.DataFrame(source_only_data)
-        if source_only_data
-        else pd.DataFrame(
-            columns=[
-                "Service",
-                "Quota Name",
-                "Source Value",
-                "Source Default",
-                "Unit",
-                "Adjustable",
-                "ServiceCode",
-                "QuotaCode"
-            ]
-        )
-    )
+    keep = ~dest_missing
+    comparison_df = quotas_df.loc[keep, COMPARISON_COLUMNS]
 
-     # Convert numeric columns to strings to avoid Arrow conversion issues
-    for col in source_only_df.select_dtypes(include='object').columns:
-        source_only_df[col] = source_only_df[col].astype('string')
+    # Quotas that exist only in destination have no source value
+    not_set = source_missing[keep]
+    if not_set.any():
+        comparison_df = comparison_df.astype({"Source Value": "string", "Source Default": "string"})
+        comparison_df.loc[not_set, ["Source Value", "Source Default"]] = "Not Set"
 
-    # Convert Delta to numeric in comparison_df
-    if not comparison_df.empty and "Delta" in comparison_df.columns:
-        comparison_df["Delta"] = pd.to_numeric(comparison_df["Delta"], errors="coerce")
-    return comparison_df, source_only_df
+    return comparison_df.reset_index(drop=True), source_only_df
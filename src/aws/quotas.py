@@ -1,187 +1,259 @@
 """
 AWS Service Quotas API interaction functions.
 """
-import time
+import functools
+import threading
 import boto3
+from botocore.config import Config
 import streamlit as st
 import concurrent.futures
 from typing import Dict, Tuple
 from pathlib import Path
 
 from src.utils.logger import logger
-from src.utils.cache import CACHE_DIR, save_to_cache, load_from_cache
+from src.utils.cache import CACHE_DIR, save_to_cache, load_from_cache, recall_quotas, remember_quotas
+
+# Number of services fetched concurrently, across all profiles/regions
+SERVICE_FETCH_WORKERS = 16
+
+# Shared by every fetch so comparing more profiles/regions queues service
+# fetches instead of multiplying threads and in-flight API calls
+_SERVICE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=SERVICE_FETCH_WORKERS, thread_name_prefix="quota-fetch"
+)
+
+# Shared client config: botocore's adaptive retry mode backs off and rate-limits
+# throttled calls client-side, and the pool is sized for the service fan-out
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": 10},
+    max_pool_connections=SERVICE_FETCH_WORKERS,
+)
+
+# Largest page the Service Quotas list APIs return, to minimise round-trips
+PAGINATION_CONFIG = {"PageSize": 100}
+
+class QuotaFetchIncomplete(Exception):
+    """Raised when some services could not be fetched; ``quotas`` holds the rest."""
+
+    def __init__(self, message, quotas):
+        super().__init__(message)
+        self.quotas = quotas
+
+# boto3 Sessions are not thread-safe, so clients are created one at a time
+_CLIENT_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _session(profile_name: str):
+    """Return a cached boto3 Session for a profile, shared by all of its regions."""
+    return boto3.Session(profile_name=profile_name)
+
+@functools.lru_cache(maxsize=32)
+def get_sq_client(profile_name: str, region_name: str):
+    """Return a cached Service Quotas client for a profile and region."""
+    with _CLIENT_LOCK:
+        return _session(profile_name).client(
+            "service-quotas", region_name=region_name, config=CLIENT_CONFIG
+        )
+
+def clear_aws_clients():
+    """Drop cached Sessions and clients so new ones pick up rotated credentials."""
+    get_sq_client.cache_clear()
+    _session.cache_clear()
+
+def _fetch_default_quota_values(client, service_code: str) -> Dict:
+    """Fetch the AWS default value of every quota in a service, keyed by QuotaCode."""
+    defaults = {}
+    try:
+        paginator = client.get_paginator("list_aws_default_service_quotas")
+        for page in paginator.paginate(ServiceCode=service_code, PaginationConfig=PAGINATION_CONFIG):
+            for quota in page["Quotas"]:
+                defaults[quota["QuotaCode"]] = quota.get("Value")
+    except Exception as e:
+        # Callers fall back to the applied value when a default is unknown
+        logger.warning(f"Could not list default quotas for {service_code}: {str(e)}")
+    return defaults
+
+def _fetch_one_service(client, service_code: str, service_name: str) -> Dict:
+    """Fetch all quotas of a single service, keyed by "Service - Quota Name".
+
+    Errors are logged and yield None so one failing service doesn't abort
+    the whole fetch.
+    """
+    logger.debug(f"Processing service: {service_name} ({service_code})")
+
+    try:
+        quota_paginator = client.get_paginator("list_service_quotas")
+        quotas = [
+            quota
+            for quota_page in quota_paginator.paginate(
+                ServiceCode=service_code, PaginationConfig=PAGINATION_CONFIG
+            )
+            for quota in quota_page["Quotas"]
+        ]
+
+        # Non-adjustable quotas always sit at their default, so only look
+        # defaults up (one paginated call per service) when something can differ
+        defaults = {}
+        if any(quota["Adjustable"] for quota in quotas):
+            defaults = _fetch_default_quota_values(client, service_code)
+
+        service_quotas = {}
+        for quota in quotas:
+            key = f"{service_name} - {quota['QuotaName']}"
+            if quota["Adjustable"]:
+                default_value = defaults.get(quota["QuotaCode"], quota["Value"])
+            else:
+                default_value = quota["Value"]
+
+            service_quotas[key] = {
+                "Value": quota["Value"],
+                "DefaultValue": default_value,
+                "Unit": quota.get("Unit", "None"),
+                "Adjustable": quota["Adjustable"],
+                "ServiceCode": service_code,
+                "QuotaCode": quota["QuotaCode"],
+            }
+        return service_quotas
+    except Exception as e:
+        logger.warning(f"Error fetching quotas for service {service_code}: {str(e)}")
+        return None
 
 def fetch_quotas_from_aws(profile_name: str, region_name: str) -> Dict:
-    """Fetch quotas from AWS for a specific profile and region."""
+    """Fetch quotas from AWS for a specific profile and region.
+
+    Raises QuotaFetchIncomplete, carrying the quotas that were fetched, when
+    any service fails, so callers never cache a partial result.
+    """
     try:
         logger.info(f"Fetching quotas from AWS for {profile_name} in {region_name}")
-        session = boto3.Session(profile_name=profile_name)
-        client = session.client("service-quotas", region_name=region_name)
+        client = get_sq_client(profile_name, region_name)
 
         quotas_data = {}
+        failed_services = []
 
         # Get list of AWS services
         logger.info("Listing AWS services")
         paginator = client.get_paginator("list_services")
-        service_count = 0
-        for page in paginator.paginate():
-            for service in page["Services"]:
-                service_code = service["ServiceCode"]
-                service_name = service["ServiceName"]
-                service_count += 1
-
-                default_value = None
-                retry_count = 0
-                base_delay = 1
-                max_retries = 5
-                
-                logger.debug(f"Processing service: {service_name} ({service_code})")
-
-                # Get quotas for each service
-                try:
-                    quota_paginator = client.get_paginator("list_service_quotas")
-                    for quota_page in quota_paginator.paginate(
-                        ServiceCode=service_code
-                    ):
-                        for quota in quota_page["Quotas"]:
-                            key = f"{service_name} - {quota['QuotaName']}"
-
-                            # Get the default value
-                            default_value = None
-                            while retry_count < max_retries:
-                                try:  
-                                    default_response = client.get_aws_default_service_quota(
-                                        ServiceCode=service_code,
-                                        QuotaCode=quota["QuotaCode"],
-                                    )
-                                    default_value = default_response.get("Quota", {}).get("Value")
-                                    # If successful, break out of the retry loop
-                                    break
-                                except client.exceptions.TooManyRequestsException:
-                                    # Calculate exponential backoff delay
-                                    delay = base_delay * (0.2 ** retry_count)
-                                    # print(f"Rate limited as Throttle rate for GetAWSDefaultServiceQuota is 5 per second Retrying in {delay} seconds...")
-                                    time.sleep(delay)
-                                    retry_count += 1
-                                    # If we've reached max retries, use the quota value as default
-                                    if retry_count >= max_retries:
-                                        default_value = quota["Value"]
-                                except client.exceptions.NoSuchResourceException:
-                                    default_value = quota["Value"]
-
-                            quotas_data[key] = {
-                                "Value": quota["Value"],
-                                "DefaultValue": default_value,
-                                "Unit": quota.get("Unit", "None"),
-                                "Adjustable": quota["Adjustable"],
-                                "ServiceCode": service_code,
-                                "QuotaCode": quota["QuotaCode"],
-                            }
-                except Exception as e:
-                    st.warning(
-                        f"Error fetching quotas for service {service_code}: {str(e)}"
-                    )
-                    continue
-
-        logger.info(f"Successfully fetched {len(quotas_data)} quotas for {profile_name} in {region_name}")
-        return quotas_data
+        services = [
+            (service["ServiceCode"], service["ServiceName"])
+            for page in paginator.paginate(PaginationConfig=PAGINATION_CONFIG)
+            for service in page["Services"]
+        ]
+        logger.info(f"Found {len(services)} services")
+
+        # Services are independent, so fetch them concurrently on the shared client
+        service_results = _SERVICE_EXECUTOR.map(
+            lambda service: _fetch_one_service(client, *service), services
+        )
+        for (service_code, _), service_quotas in zip(services, service_results):
+            if service_quotas is None:
+                failed_services.append(service_code)
+            else:
+                quotas_data.update(service_quotas)
 
     except Exception as e:
-        st.error(
-            f"Error fetching quotas for profile {profile_name} in region {region_name}: {str(e)}"
+        logger.error(f"Error fetching quotas for profile {profile_name} in region {region_name}: {str(e)}")
+        raise
+
+    if failed_services:
+        raise QuotaFetchIncomplete(
+            f"{len(failed_services)} of {len(services)} services could not be fetched", quotas_data
         )
-        return {}
+
+    logger.info(f"Successfully fetched {len(quotas_data)} quotas for {profile_name} in {region_name}")
+    return quotas_data
+
+def _load_cached_quotas(profile_name: str, region_name: str, cache_file: Path, status):
+    """Return quotas from memory or the Parquet cache file, or None to fetch from AWS."""
+    quotas = recall_quotas(profile_name, region_name)
+    if quotas is not None:
+        status.write(f"Loaded cached data for {profile_name} in {region_name}")
+        return quotas
+
+    if cache_file.exists():
+        quotas = load_from_cache(cache_file)
+        if quotas is not None:
+            remember_quotas(profile_name, region_name, quotas)
+            status.write(f"Loaded cached data for {profile_name} in {region_name}")
+            return quotas
+        status.write(f"Cache read failed for {profile_name}, fetching from AWS...")
+    return None
 
 def fetch_quotas_in_parallel(source_profile: str, source_region: str, dest_profile: str, dest_region: str, enable_cache: bool = False) -> Tuple[Dict, Dict]:
     """Fetch quotas for source and destination in parallel."""
     logger.info(f"Fetching quotas in parallel for source ({source_profile}/{source_region}) and destination ({dest_profile}/{dest_region})")
     logger.info(f"Enable Cache: {enable_cache}")
     
-    # Create placeholders for progress messages
-    source_placeholder = st.empty()
-    dest_placeholder = st.empty()
-    source_placeholder.info(f"Fetching data for {source_profile} in {source_region}...")
-    dest_placeholder.info(f"Fetching data for {dest_profile} in {dest_region}...")
+    source_cache_file = CACHE_DIR / f"quotas_{source_profile}_{source_region}.parquet"
+    dest_cache_file = CACHE_DIR / f"quotas_{dest_profile}_{dest_region}.parquet"
     
-    # Store the placeholders in session state so we can clear them later
-    if "info_placeholders" not in st.session_state:
-        st.session_state.info_placeholders = []
-    st.session_state.info_placeholders.extend([source_placeholder, dest_placeholder])
+    cache_files = {"source": source_cache_file, "dest": dest_cache_file}
+    results = {"source": {}, "dest": {}}
+    failed = False
     
-    source_cache_file = CACHE_DIR / f"quotas_{source_profile}_{source_region}.json"
-    dest_cache_file = CACHE_DIR / f"quotas_{dest_profile}_{dest_region}.json"
-    
-    source_quotas = {}
-    dest_quotas = {}
-    
-    # Track whether we need to fetch from AWS
-    fetch_source = True
-    fetch_dest = True
-    
-    # Check if cache files exist and try to load them
-    if enable_cache:
-        if source_cache_file.exists():
-            source_placeholder.info(f"Loading cached data for {source_profile} in {source_region}...")
-            cached_source_quotas = load_from_cache(source_cache_file)
-            if cached_source_quotas is not None:
-                source_quotas = cached_source_quotas
-                fetch_source = False
-                source_placeholder.success(f"Loaded cached data for {source_profile} in {source_region}")
-            else:
-                source_placeholder.warning(f"Cache read failed for {source_profile}, fetching from AWS...")
-        
-        if dest_cache_file.exists():
-            dest_placeholder.info(f"Loading cached data for {dest_profile} in {dest_region}...")
-            cached_dest_quotas = load_from_cache(dest_cache_file)
-            if cached_dest_quotas is not None:
-                dest_quotas = cached_dest_quotas
-                fetch_dest = False
-                dest_placeholder.success(f"Loaded cached data for {dest_profile} in {dest_region}")
+    # Report progress for both sides in a single status container
+    with st.status("Fetching quotas...", expanded=True) as status:
+        # With the cache option, use quotas kept in memory or on disk when present;
+        # without it, always go back to AWS
+        pending = []
+        for task_type, profile, region in (
+            ("source", source_profile, source_region),
+            ("dest", dest_profile, dest_region),
+        ):
+            cached_quotas = None
+            if enable_cache:
+                cached_quotas = _load_cached_quotas(profile, region, cache_files[task_type], status)
+            if cached_quotas is not None:
+                results[task_type] = cached_quotas
             else:
-                dest_placeholder.warning(f"Cache read failed for {dest_profile}, fetching from AWS...")
-    
-    # Use ThreadPoolExecutor to fetch quotas in parallel if needed
-    if fetch_source or fetch_dest:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            # Define tasks based on what needs to be fetched
-            tasks = {}
-            
-            if fetch_source:
-                tasks[executor.submit(fetch_quotas_from_aws, source_profile, source_region)] = "source"
+                pending.append((task_type, profile, region))
+
+        # Use ThreadPoolExecutor to fetch quotas in parallel if needed, one worker per fetch
+        if pending:
+            for _, profile, region in pending:
+                status.write(f"Fetching data for {profile} in {region}...")
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                tasks = {
+                    executor.submit(fetch_quotas_from_aws, profile, region): (task_type, profile, region)
+                    for task_type, profile, region in pending
+                }
                 
-            if fetch_dest:
-                tasks[executor.submit(fetch_quotas_from_aws, dest_profile, dest_region)] = "dest"
-            
-            # Process completed tasks
-            for future in concurrent.futures.as_completed(tasks):
-                task_type = tasks[future]
-                try:
-                    result = future.result()
-                    if task_type == "source":
-                        source_quotas = result
-                        source_placeholder.success(f"Completed fetching data for {source_profile} in {source_region}")
-                        # Save to cache if we have data
-                        if source_quotas and enable_cache:
-                            save_to_cache(source_quotas, source_cache_file)
-                    else:  # dest
-                        dest_quotas = result
-                        dest_placeholder.success(f"Completed fetching data for {dest_profile} in {dest_region}")
-                        # Save to cache if we have data
-                        if dest_quotas and enable_cache:
-                            save_to_cache(dest_quotas, dest_cache_file)
-                except Exception as e:
-                    if task_type == "source":
-                        source_placeholder.error(f"Error fetching quotas for {source_profile}: {str(e)}")
-                    else:  # dest
-                        dest_placeholder.error(f"Error fetching quotas for {dest_profile}: {str(e)}")
+                # Process completed tasks; status updates stay on the script thread
+                for future in concurrent.futures.as_completed(tasks):
+                    task_type, profile, region = tasks[future]
+                    try:
+                        result = future.result()
+                    except QuotaFetchIncomplete as e:
+                        # Show what was fetched, but don't cache a partial result
+                        failed = True
+                        results[task_type] = e.quotas
+                        status.write(f"Incomplete quotas for {profile} in {region}: {str(e)}")
+                        continue
+                    except Exception as e:
+                        failed = True
+                        status.write(f"Error fetching quotas for {profile}: {str(e)}")
+                        continue
+
+                    status.write(f"Completed fetching data for {profile} in {region}")
+                    results[task_type] = result
+                    # Only complete, non-empty fetches are cached
+                    if result:
+                        remember_quotas(profile, region, result)
+                        if enable_cache:
+                            save_to_cache(result, cache_files[task_type])
+
+        if failed:
+            status.update(label="Error fetching quotas", state="error")
+        else:
+            status.update(label="Fetched quotas", state="complete", expanded=False)
     
-    return source_quotas, dest_quotas
+    return results["source"], results["dest"]
 
 def request_quota_increase(profile_name: str, region_name: str, service_code: str, quota_code: str, desired_value: float):
     """Request a quota increase for a specific service and quota."""
     try:
-        session = boto3.Session(profile_name=profile_name)
-        client = session.client("service-quotas", region_name=region_name)
+        client = get_sq_client(profile_name, region_name)
         
         response = client.request_service_quota_increase(
             ServiceCode=service_code,
@@ -198,8 +270,7 @@ def request_quota_increase(profile_name: str, region_name: str, service_code: st
 def get_quota_request_status(profile_name: str, region_name: str, request_id: str):
     """Get the status of a quota increase request."""
     try:
-        session = boto3.Session(profile_name=profile_name)
-        client = session.client("service-quotas", region_name=region_name)
+        client = get_sq_client(profile_name, region_name)
         
         response = client.get_requested_service_quota_change(
             RequestId=request_id
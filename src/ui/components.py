@@ -1,8 +1,10 @@
 """
 UI components for the Streamlit interface.
 """
+import numpy as np
+import pandas as pd
 import streamlit as st
-from src.ui.formatting import add_row_numbers, highlight_differences, highlight_status, create_column_config
+from src.ui.formatting import add_row_numbers, highlight_differences, highlight_status, QUOTA_EDITOR_COLUMN_CONFIG
 from src.ui.callbacks import select_all_callback, deselect_all_callback, bt_callback
 
 def display_summary_metrics(df, source_only_df):
@@ -11,9 +13,10 @@ def display_summary_metrics(df, source_only_df):
     col1, col2, col3, col4 = st.columns(4)
 
     total_quotas = len(df)
-    different_quotas = len(df[df["Delta"].notna() & (df["Delta"] != 0)])
-    adjustable_quotas = len(df[df["Adjustable"] == "✅"])
-    source_only_services = len(source_only_df["Service"].unique()) if not source_only_df.empty else 0
+    # Reduce the boolean masks directly rather than materialising filtered frames
+    different_quotas = int((df["Delta"].notna() & (df["Delta"] != 0)).sum())
+    adjustable_quotas = int((df["Adjustable"] == "✅").sum())
+    source_only_services = source_only_df["Service"].nunique()
 
     with col1:
         st.metric("Total Quotas", total_quotas)
@@ -39,15 +42,12 @@ def display_quota_selection_interface(different_df):
     """Display interface for selecting quotas to increase."""
     if not different_df.empty:
         # Add row numbers to the DataFrame
-        different_df = different_df.copy()
-        different_df.insert(
-            0, "#", range(1, len(different_df) + 1)
-        )  # Insert row numbers as first column
+        different_df = add_row_numbers(different_df)
         different_df["Request Increase"] = False
 
         # Initialize session state for edited_df if not present
         if "edited_df" not in st.session_state:
-            st.session_state.edited_df = different_df.copy()
+            st.session_state.edited_df = different_df
 
         # Create selection interface
         st.markdown("Select quotas to request increases:")
@@ -66,7 +66,7 @@ def display_quota_selection_interface(different_df):
                 hide_index=True,
                 use_container_width=True,
                 key="quota_editor",
-                column_config=create_column_config()
+                column_config=QUOTA_EDITOR_COLUMN_CONFIG
             )
 
             # Update session state with edited values
@@ -83,18 +83,45 @@ def display_all_quotas(df):
     st.markdown("#### All Quotas")
     if not df.empty:
         df_numbered = add_row_numbers(df)
-        styled_df = df_numbered.style.apply(highlight_differences, axis=1)
+        styled_df = df_numbered.style.apply(highlight_differences, axis=None)
         st.dataframe(styled_df, hide_index=True, use_container_width=True)
 
-def display_quota_request_status_summary(status_df):
-    """Display summary of quota request statuses."""
+# Request status buckets shown in the status filter and summary
+STATUS_BUCKETS = ["PENDING", "APPROVED", "DENIED", "NOT_APPROVED"]
+
+def status_buckets(statuses):
+    """Map each request status to a categorical STATUS_BUCKETS value.
+
+    PENDING, DENIED and NOT_APPROVED match anywhere in the status (ignoring
+    case), APPROVED only exactly; anything else is missing.
+    """
+    buckets = statuses.astype("string").str.upper().str.extract(
+        r"(NOT_APPROVED|PENDING|DENIED)", expand=False
+    )
+    buckets = buckets.mask(statuses == "APPROVED", "APPROVED")
+    return buckets.astype(pd.CategoricalDtype(STATUS_BUCKETS))
+
+def in_status_buckets(buckets, selected=STATUS_BUCKETS):
+    """Return a boolean array marking bucketed statuses that are in ``selected``."""
+    codes = buckets.cat.categories.get_indexer(list(selected))
+    return np.isin(buckets.cat.codes.to_numpy(), codes)
+
+def display_quota_request_status_summary(status_df, buckets=None):
+    """Display summary of quota request statuses.
+
+    ``buckets`` can pass in status_buckets() already computed for ``status_df``.
+    """
     if not status_df.empty:
         st.write("### Summary")
         total = len(status_df)
-        pending = len(status_df[status_df["Request Status"].str.contains("PENDING", case=False, na=False)])
-        approved = len(status_df[status_df["Request Status"] == "APPROVED"])
-        denied = len(status_df[status_df["Request Status"].str.contains("DENIED", case=False, na=False)])
-        not_approved = len(status_df[status_df["Request Status"].str.contains("NOT_APPROVED", case=False, na=False)])
+        if buckets is None:
+            buckets = status_buckets(status_df["Request Status"])
+        # One count per bucket from the categorical codes
+        counts = buckets.value_counts()
+        pending = int(counts["PENDING"])
+        approved = int(counts["APPROVED"])
+        denied = int(counts["DENIED"])
+        not_approved = int(counts["NOT_APPROVED"])
         
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
@@ -116,14 +143,17 @@ def display_quota_submission_summary(history_df):
         
         # Display the styled DataFrame
         st.write("### Quota Submission Summary")
-        styled_history_df = history_df[display_columns].style.apply(highlight_status, axis=1)
+        styled_history_df = history_df[display_columns].style.apply(highlight_status, axis=None)
         st.dataframe(styled_history_df, use_container_width=True, hide_index=True)
         
         # Show statistics
         total = len(history_df)
-        successful = len(history_df[~history_df["Request Status"].str.contains("Failed|Skipped", na=False)])
-        failed = len(history_df[history_df["Request Status"].str.contains("Failed", na=False)])
-        skipped = len(history_df[history_df["Request Status"].str.contains("Skipped", na=False)])
+        status = history_df["Request Status"].fillna("")
+        failed_mask = status.str.contains("Failed", regex=False)
+        skipped_mask = status.str.contains("Skipped", regex=False)
+        successful = int((~(failed_mask | skipped_mask)).sum())
+        failed = int(failed_mask.sum())
+        skipped = int(skipped_mask.sum())
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -1,38 +1,59 @@
 """
 UI formatting utilities for the Streamlit interface.
 """
+import numpy as np
+import pandas as pd
 import streamlit as st
 
 def add_row_numbers(df):
     """Add row numbers to a DataFrame."""
-    df = df.copy()
-    # Create a new column "#" with row numbers and insert it at the beginning
-    df.insert(0, "#", range(1, len(df) + 1))
+    # A shallow copy shares the column data; inserting "#" leaves the caller's frame untouched
+    df = df.copy(deep=False)
+    df.insert(0, "#", np.arange(1, len(df) + 1))
     return df
 
-def highlight_differences(row):
-    """Highlight rows where values are different between source and destination."""
-    if isinstance(row["Delta"], (int, float)) and row["Delta"] != 0:
-        return ["background-color: #ffeb99"] * len(row)
-    return [""] * len(row)
+def _row_styles(df, row_styles):
+    """Broadcast one CSS string per row across every column of df."""
+    return pd.DataFrame(
+        np.repeat(np.asarray(row_styles, dtype=object)[:, None], df.shape[1], axis=1),
+        index=df.index,
+        columns=df.columns,
+    )
 
-def highlight_status(row):
-    """Highlight rows based on request status."""
-    status = str(row.get("Request Status", ""))
-    if status == "APPROVED":
-        return ["background-color: #ccffcc"] * len(row)  # Green
-    elif status == "PENDING":
-        return ["background-color: #ffffcc"] * len(row)  # Yellow
-    elif status == "DENIED":
-        return ["background-color: #ffcccc"] * len(row)  # Red
-    elif status == "NOT_APPROVED":
-        return ["background-color: #ffeecc"] * len(row)  # Light orange
-    elif "Failed" in status:
-        return ["background-color: #ffcccc"] * len(row)  # Red
-    elif "Skipped" in status:
-        return ["background-color: #ffffcc"] * len(row)  # Yellow
-    else:
-        return [""] * len(row)
+def highlight_differences(df):
+    """Highlight rows where values are different between source and destination.
+
+    Meant for ``Styler.apply(..., axis=None)`` so the whole frame is styled in one pass.
+    """
+    # One column-level coercion; non-numeric or missing deltas are never highlighted
+    different = (pd.to_numeric(df["Delta"], errors="coerce").fillna(0) != 0).to_numpy()
+    return _row_styles(df, np.where(different, "background-color: #ffeb99", ""))
+
+def highlight_status(df):
+    """Highlight rows based on request status.
+
+    Meant for ``Styler.apply(..., axis=None)`` so the whole frame is styled in one pass.
+    """
+    if "Request Status" not in df.columns:
+        return _row_styles(df, np.full(len(df), ""))
+    status = df["Request Status"].fillna("").astype(str)
+    conditions = [
+        (status == "APPROVED").to_numpy(),
+        (status == "PENDING").to_numpy(),
+        (status == "DENIED").to_numpy(),
+        (status == "NOT_APPROVED").to_numpy(),
+        status.str.contains("Failed", regex=False).to_numpy(),
+        status.str.contains("Skipped", regex=False).to_numpy(),
+    ]
+    choices = [
+        "background-color: #ccffcc",  # Green
+        "background-color: #ffffcc",  # Yellow
+        "background-color: #ffcccc",  # Red
+        "background-color: #ffeecc",  # Light orange
+        "background-color: #ffcccc",  # Red
+        "background-color: #ffffcc",  # Yellow
+    ]
+    return _row_styles(df, np.select(conditions, choices, default=""))
 
 def create_column_config():
     """Create column configuration for data editor."""
@@ -67,3 +88,7 @@ def create_column_config():
             "Adjustable", disabled=True
         ),
     }
+
+# Built once per process; app.py itself is re-executed on every Streamlit rerun.
+# st.data_editor copies the config it is given, so sharing one dict is safe.
+QUOTA_EDITOR_COLUMN_CONFIG = create_column_config()
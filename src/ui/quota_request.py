@@ -1,126 +1,175 @@
 """
 Functions for handling quota increase requests.
 """
-import json
-import uuid
+import re
+import secrets
 import datetime
-import time
+from pathlib import Path
+import concurrent.futures
 import streamlit as st
 import pandas as pd
-import boto3
+from botocore.exceptions import ClientError
 
 from src.utils.logger import logger
-from src.utils.cache import CACHE_DIR
+from src.aws.quotas import get_sq_client
+from src.utils.cache import CACHE_DIR, append_jsonl, dir_mtime_ns, read_json, read_jsonl, write_json, write_jsonl
 from src.ui.formatting import highlight_status
-from src.ui.components import display_quota_submission_summary
+from src.ui.components import (
+    display_quota_submission_summary,
+    display_quota_request_status_summary,
+    in_status_buckets,
+    status_buckets
+)
+
+# Upper bound on concurrent RequestServiceQuotaIncrease calls
+QUOTA_REQUEST_WORKERS = 16
+
+# Error codes reported when a call is still throttled after all retries
+THROTTLING_ERROR_CODES = ("Throttling", "ThrottlingException", "TooManyRequestsException")
+
+# History files are quotas_history_YYYYMMDDHHMMSS_UNIQUEID.jsonl; .json files
+# from earlier versions are still read
+HISTORY_FILE_PATTERN = re.compile(r"quotas_history_(\d{14})_([^_.]+)\.jsonl?")
+
+# Concurrent GetRequestedServiceQuotaChange calls when refreshing request status
+STATUS_CHECK_WORKERS = 10
+
+# AWS request statuses that never change again, so are not looked up on refresh
+TERMINAL_REQUEST_STATUSES = frozenset(
+    {"APPROVED", "DENIED", "NOT_APPROVED", "CASE_CLOSED", "INVALID_REQUEST"}
+)
+
+def _quota_rows(quotas_df):
+    """Iterate quota rows as named tuples; spaces in column names become underscores."""
+    return quotas_df.rename(columns=lambda column: column.replace(" ", "_")).itertuples(index=False)
+
+def _unsubmitted_entry(row, request_id, requested_id, status):
+    """Build the history entry recorded for a quota that was skipped or failed to submit."""
+    return {
+        "AqrToolRequestId": request_id,
+        "RequestedId": requested_id,
+        "Service": row.Service,
+        "Quota Name": row.Quota_Name,
+        "Existing Quota Value": row.Destination_Value,
+        "Desired Quota Value": row.Source_Value,
+        "ServiceCode": row.ServiceCode,
+        "QuotaCode": row.QuotaCode,
+        "Request Status": status,
+    }
+
+def _failed_entry(row, request_id, reason):
+    """Build the history entry recorded for a request that could not be submitted."""
+    return _unsubmitted_entry(row, request_id, "Failed", f"Failed: {reason}")
+
+def _submit_one(client, row, request_id):
+    """Submit one quota increase request.
+
+    Throttling is retried by the shared client's adaptive retry mode. Runs on a
+    worker thread, so it returns ``(history_entry, error)`` and leaves any
+    Streamlit messages to the caller.
+    """
+    try:
+        response = client.request_service_quota_increase(
+            ServiceCode=row.ServiceCode,
+            QuotaCode=row.QuotaCode,
+            DesiredValue=float(row.Source_Value),
+            SupportCaseAllowed=False
+        )
+
+        # A malformed response is recorded as a failure like any other error
+        requested_quota = response['RequestedQuota']
+        return {
+            "AqrToolRequestId": request_id,
+            "RequestedId": requested_quota["Id"],
+            "Service": requested_quota["ServiceName"],
+            "Quota Name": requested_quota["QuotaName"],
+            "Existing Quota Value": row.Destination_Value,
+            "Desired Quota Value": requested_quota["DesiredValue"],
+            "ServiceCode": row.ServiceCode,
+            "QuotaCode": requested_quota["QuotaCode"],
+            "Request Status": requested_quota['Status'],
+        }, None
+    except ClientError as e:
+        # Still throttled once botocore's retries are exhausted
+        if e.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+            return _failed_entry(row, request_id, "Rate limit exceeded"), "Rate limit exceeded"
+        return _failed_entry(row, request_id, str(e)), str(e)
+    except Exception as e:
+        return _failed_entry(row, request_id, str(e)), str(e)
 
 def process_quota_increase_requests(dest_profile, dest_region, selected_quotas):
     """Process quota increase requests for selected quotas."""
-    quotas_history_data = []
-    unique_id = str(uuid.uuid4().int)[:8]
+    # One slot per selected quota, filled by position so selection order is kept
+    quotas_history_data = [None] * len(selected_quotas)
+    # (level, text) messages, rendered together once processing is done
+    messages = []
+    unique_id = secrets.token_hex(4)
     now = datetime.datetime.now()
     timestamp = now.strftime('%Y%m%d%H%M%S')
-    quota_submission_history_file = CACHE_DIR / f"quotas_history_{timestamp}_{unique_id}.json"
+    quota_submission_history_file = CACHE_DIR / f"quotas_history_{timestamp}_{unique_id}.jsonl"
     
     if not selected_quotas.empty:
+        # History is written as JSON Lines while requests complete, so an
+        # interrupted batch still leaves a record of what was submitted
+        try:
+            history_file = open(quota_submission_history_file, "ab")
+        except OSError as e:
+            st.warning(f"History write error: {str(e)}")
+            history_file = None
+
         try:
-            session = boto3.Session(profile_name=dest_profile)
-            client = session.client("service-quotas", region_name=dest_region)
-            retry_count = 0
-            base_delay = 1
-            max_retries = 5
+            # Shared cached client; its adaptive retry mode handles throttling
+            client = get_sq_client(dest_profile, dest_region)
+            request_id = f'{timestamp}_{unique_id}'
+
+            # Submit adjustable quotas concurrently; boto3 clients are thread-safe.
+            # Skipped rows are recorded inline without a worker.
+            adjustable_count = int((selected_quotas["Adjustable"] == "✅").sum())
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(QUOTA_REQUEST_WORKERS, adjustable_count))
+            ) as executor:
+                futures = {}
+                for position, row in enumerate(_quota_rows(selected_quotas)):
+                    if row.Adjustable == "✅":  # Only process adjustable quotas
+                        futures[position] = (row, executor.submit(_submit_one, client, row, request_id))
+                    else:
+                        messages.append(("warning", f"Skipped non-adjustable quota: {row.Service} - {row.Quota_Name}"))
+                        # Add skipped quotas to history
+                        quotas_history_data[position] = _unsubmitted_entry(
+                            row, request_id, "Skipped", "Skipped (Non-adjustable)"
+                        )
 
-            # Process each selected quota
-            for _, row in selected_quotas.iterrows():
-                if row["Adjustable"] == "✅":  # Only process adjustable quotas
-                    while retry_count < max_retries:
+                # Persist each entry, in selection order, as soon as it is known
+                for position in range(len(quotas_history_data)):
+                    if position in futures:
+                        row, future = futures[position]
+                        entry, error = future.result()
+                        if error:
+                            messages.append(("error", f"Failed to request increase for {row.Service} - {row.Quota_Name}: {error}"))
+                        quotas_history_data[position] = entry
+
+                    if history_file is not None:
                         try:
-                            response = client.request_service_quota_increase(
-                                ServiceCode=row["ServiceCode"],
-                                QuotaCode=row["QuotaCode"],
-                                DesiredValue=float(row["Source Value"]),
-                                SupportCaseAllowed=False
-                            )
-                            requested_quota = response['RequestedQuota']
-                            quotas_history_data.append(
-                                {
-                                    "AqrToolRequestId": f'{timestamp}_{unique_id}',
-                                    "RequestedId": requested_quota["Id"],
-                                    "Service": requested_quota["ServiceName"],
-                                    "Quota Name": requested_quota["QuotaName"],
-                                    "Existing Quota Value": row["Destination Value"],
-                                    "Desired Quota Value": requested_quota["DesiredValue"],
-                                    "ServiceCode": row["ServiceCode"],
-                                    "QuotaCode": requested_quota["QuotaCode"],
-                                    "Request Status": requested_quota['Status'],
-                                }
-                            )
-                            break  # Success, exit the retry loop
-                        except client.exceptions.TooManyRequestsException as e:
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                delay = base_delay * (2 ** retry_count)
-                                logger.debug(f"Retrying in {delay} seconds due to rate limiting")
-                                time.sleep(delay)
-                            else:
-                                st.error(f"Failed to request increase for {row['Service']} - {row['Quota Name']}: Rate limit exceeded")
-                                # Add failed requests to history with error status
-                                quotas_history_data.append(
-                                    {
-                                        "AqrToolRequestId": f'{timestamp}_{unique_id}',
-                                        "RequestedId": "Failed",
-                                        "Service": row["Service"],
-                                        "Quota Name": row["Quota Name"],
-                                        "Existing Quota Value": row["Destination Value"],
-                                        "Desired Quota Value": row["Source Value"],
-                                        "ServiceCode": row["ServiceCode"],
-                                        "QuotaCode": row["QuotaCode"],
-                                        "Request Status": f"Failed: Rate limit exceeded",
-                                    }
-                                )
-                                break
-                        except Exception as e:
-                            st.error(f"Failed to request increase for {row['Service']} - {row['Quota Name']}: {str(e)}")
-                            # Add failed requests to history with error status
-                            quotas_history_data.append(
-                                {
-                                    "AqrToolRequestId": f'{timestamp}_{unique_id}',
-                                    "RequestedId": "Failed",
-                                    "Service": row["Service"],
-                                    "Quota Name": row["Quota Name"],
-                                    "Existing Quota Value": row["Destination Value"],
-                                    "Desired Quota Value": row["Source Value"],
-                                    "ServiceCode": row["ServiceCode"],
-                                    "QuotaCode": row["QuotaCode"],
-                                    "Request Status": f"Failed: {str(e)}",
-                                }
-                            )
-                            break
-                else:
-                    st.warning(f"Skipped non-adjustable quota: {row['Service']} - {row['Quota Name']}")
-                    # Add skipped quotas to history
-                    quotas_history_data.append(
-                        {
-                            "AqrToolRequestId": f'{timestamp}_{unique_id}',
-                            "RequestedId": "Skipped",
-                            "Service": row["Service"],
-                            "Quota Name": row["Quota Name"],
-                            "Existing Quota Value": row["Destination Value"],
-                            "Desired Quota Value": row["Source Value"],
-                            "ServiceCode": row["ServiceCode"],
-                            "QuotaCode": row["QuotaCode"],
-                            "Request Status": "Skipped (Non-adjustable)",
-                        }
-                    )
+                            append_jsonl(history_file, quotas_history_data[position])
+                            history_file.flush()
+                        except OSError as e:
+                            st.warning(f"History write error: {str(e)}")
+                            history_file.close()
+                            history_file = None
         except Exception as e:
             st.error(f"Failed to create AWS client: {str(e)}")
-        
-        # Save quota submission history to file
-        try:
-            with open(quota_submission_history_file, "w") as f:
-                json.dump(quotas_history_data, f)
-        except Exception as e:
-            st.warning(f"History write error: {str(e)}")
+        finally:
+            if history_file is not None:
+                history_file.close()
+
+        # Drop slots that were never filled because processing stopped early
+        quotas_history_data = [entry for entry in quotas_history_data if entry is not None]
+
+        # Show per-quota warnings and errors together instead of one element per row
+        if messages:
+            with st.expander("Details", expanded=any(level == "error" for level, _ in messages)):
+                for level, text in messages:
+                    getattr(st, level)(text)
         
         # Display submission summary
         if quotas_history_data:
@@ -134,18 +183,65 @@ def process_quota_increase_requests(dest_profile, dest_region, selected_quotas):
     
     return timestamp, unique_id
 
+def _history_file(request_id):
+    """Return the history file for a request ID, preferring JSON Lines over legacy JSON."""
+    jsonl_file = CACHE_DIR / f"quotas_history_{request_id}.jsonl"
+    if jsonl_file.exists():
+        return jsonl_file
+    return CACHE_DIR / f"quotas_history_{request_id}.json"
+
+def _read_history(history_file):
+    """Load history entries from a JSON Lines or legacy JSON history file."""
+    if history_file.suffix == ".jsonl":
+        return read_jsonl(history_file)
+    return read_json(history_file)
+
+def _write_history(history_file, entries):
+    """Rewrite a history file, keeping its existing format."""
+    if history_file.suffix == ".jsonl":
+        write_jsonl(history_file, entries)
+    else:
+        write_json(history_file, entries)
+
+def _needs_status_check(request):
+    """Return True for history entries that have an AWS request ID to look up."""
+    status = request.get("Request Status", "")
+    # Entries that were already marked as skipped or failed, or that reached a
+    # terminal AWS status, are final; keep their previous "Last Checked"
+    if status in TERMINAL_REQUEST_STATUSES or "Skipped" in status or "Failed" in status:
+        return False
+    return request.get("RequestedId") not in (None, "", "Failed", "Skipped")
+
+def _check_one(sq_client, request, checked_at):
+    """Fetch the current status of one submitted request and return the updated entry."""
+    updated_request = request.copy()
+    try:
+        response = sq_client.get_requested_service_quota_change(
+            RequestId=request["RequestedId"]
+        )
+        
+        # Update the status
+        requested_quota = response.get("RequestedQuota", {})
+        current_status = requested_quota.get("Status", "Unknown")
+        logger.info(f"Retrieved status for {request.get('Service')} - {request.get('Quota Name')}: {current_status}")
+        updated_request["Request Status"] = current_status
+    except Exception as e:
+        # If we can't get the status, keep the original status but note the error
+        updated_request["Request Status"] = f"{request.get('Request Status', 'Unknown')} (Status check failed: {str(e)})"
+    updated_request["Last Checked"] = checked_at
+    return updated_request
+
 def check_quota_request_status(dest_profile, dest_region, request_id):
     """Check the status of previously submitted quota increase requests."""
     with st.spinner("Checking quota request status..."):
         logger.info(f"Checking status for request ID: {request_id}")
         # Find the selected request file
-        selected_file = CACHE_DIR / f'quotas_history_{request_id}.json'
+        selected_file = _history_file(request_id)
         
         # Load the request history
         try:
-            with open(selected_file, "r") as f:
-                history_data = json.load(f)
-                logger.info(f"Successfully loaded history data with {len(history_data)} entries")
+            history_data = _read_history(selected_file)
+            logger.info(f"Successfully loaded history data with {len(history_data)} entries")
         except Exception as e:
             error_msg = f"Error reading history file: {str(e)}"
             logger.error(error_msg)
@@ -159,45 +255,24 @@ def check_quota_request_status(dest_profile, dest_region, request_id):
         
         # Create AWS client for checking status
         try:
-            session = boto3.Session(profile_name=dest_profile)
-            sq_client = session.client("service-quotas", region_name=dest_region)
+            sq_client = get_sq_client(dest_profile, dest_region)
             
-            # Update status for each request
-            updated_status = []
-            
-            for request in history_data:
-                # Skip entries that were already marked as skipped or failed
-                if "Skipped" in request.get("Request Status", "") or "Failed" in request.get("Request Status", ""):
-                    updated_status.append(request)
-                    continue
-                    
-                # Get the current status for requests that have an ID
-                if request.get("RequestedId") and request["RequestedId"] != "Failed" and request["RequestedId"] != "Skipped":
-                    try:
-                        response = sq_client.get_requested_service_quota_change(
-                            RequestId=request["RequestedId"]
-                        )
-                        
-                        # Update the status
-                        requested_quota = response.get("RequestedQuota", {})
-                        current_status = requested_quota.get("Status", "Unknown")
-                        logger.info(f"Retrieved status for {request.get('Service')} - {request.get('Quota Name')}: {current_status}")
-                        
-                        # Create updated request entry
-                        updated_request = request.copy()
-                        updated_request["Request Status"] = current_status
-                        updated_request["Last Checked"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        
-                        updated_status.append(updated_request)
-                    except Exception as e:
-                        # If we can't get the status, keep the original status but note the error
-                        updated_request = request.copy()
-                        updated_request["Request Status"] = f"{request.get('Request Status', 'Unknown')} (Status check failed: {str(e)})"
-                        updated_request["Last Checked"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        updated_status.append(updated_request)
-                else:
-                    # Keep the original entry for requests without IDs
-                    updated_status.append(request)
+            # Only requests with a real AWS request ID need a status call; look those
+            # up concurrently and keep every other entry as-is, in file order
+            updated_status = list(history_data)
+            pending = [i for i, request in enumerate(history_data) if _needs_status_check(request)]
+            # One "Last Checked" stamp for the whole refresh
+            checked_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if pending:
+                with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(STATUS_CHECK_WORKERS, len(pending))
+                ) as executor:
+                    checked = executor.map(
+                        lambda request: _check_one(sq_client, request, checked_at),
+                        [history_data[i] for i in pending],
+                    )
+                    for i, updated_request in zip(pending, checked):
+                        updated_status[i] = updated_request
             
             # Create DataFrame for display
             if updated_status:
@@ -215,47 +290,17 @@ def check_quota_request_status(dest_profile, dest_region, request_id):
                 
                 # Filter to show only pending or not approved
                 if not status_df.empty:
-                    # Create filters
                     st.write("Filter by status:")
-                    col1, col2, col3, col4 = st.columns(4)
-                    # Apply filters
-                    filtered_df = status_df.copy()
-                    mask = pd.Series(False, index=filtered_df.index)
-                    
-                    with col1:
-                        mask = mask | filtered_df["Request Status"].str.contains("PENDING", case=False, na=False)
-                    with col2:
-                        mask = mask | (filtered_df["Request Status"] == "APPROVED")
-                    with col3:
-                        mask = mask | filtered_df["Request Status"].str.contains("DENIED", case=False, na=False)
-                    with col4:
-                        mask = mask | filtered_df["Request Status"].str.contains("NOT_APPROVED", case=False, na=False)
-                    
-                    filtered_df = filtered_df[mask]
+                    # Bucket the statuses once for both the filter and the summary
+                    buckets = status_buckets(status_df["Request Status"])
+                    filtered_df = status_df[in_status_buckets(buckets)]
                     
                     if not filtered_df.empty:
-                        styled_df = filtered_df[display_columns].style.apply(highlight_status, axis=1)
+                        styled_df = filtered_df[display_columns].style.apply(highlight_status, axis=None)
                         st.dataframe(styled_df, use_container_width=True, hide_index=True)
                         
                         # Show statistics
-                        st.write("### Summary")
-                        total = len(status_df)
-                        pending = len(status_df[status_df["Request Status"].str.contains("PENDING", case=False, na=False)])
-                        approved = len(status_df[status_df["Request Status"] == "APPROVED"])
-                        denied = len(status_df[status_df["Request Status"].str.contains("DENIED", case=False, na=False)])
-                        not_approved = len(status_df[status_df["Request Status"].str.contains("NOT_APPROVED", case=False, na=False)])
-                        
-                        col1, col2, col3, col4, col5 = st.columns(5)
-                        with col1:
-                            st.metric("Total", total)
-                        with col2:
-                            st.metric("Pending", pending)
-                        with col3:
-                            st.metric("Approved", approved)
-                        with col4:
-                            st.metric("Denied", denied)
-                        with col5:
-                            st.metric("Not Approved", not_approved)
+                        display_quota_request_status_summary(status_df, buckets)
                     else:
                         st.info("No quota requests match the selected filters.")
                 else:
@@ -263,8 +308,7 @@ def check_quota_request_status(dest_profile, dest_region, request_id):
                 
                 # Save the updated status back to the file
                 try:
-                    with open(selected_file, "w") as f:
-                        json.dump(updated_status, f)
+                    _write_history(selected_file, updated_status)
                     # st.success("For all the Not Approved or Denied Quotas submit a [support ticket](https://support.console.aws.amazon.com/)")
                     st.success("For all the Not Approved or Denied Quotas, please contact AWS through your TAMs for further support")
                     st.success(f"Status information updated and saved to {selected_file.name}")
@@ -275,27 +319,37 @@ def check_quota_request_status(dest_profile, dest_region, request_id):
         except Exception as e:
             st.error(f"Error checking quota status: {str(e)}")
 
-def get_request_history_files():
-    """Get list of quota request history files."""
-    history_files = list(CACHE_DIR.glob("quotas_history_*.json"))
-    
+@st.cache_data(show_spinner=False, max_entries=1)
+def _scan_request_history_files(cache_dir_mtime_ns):
+    """Parse the request history filenames in CACHE_DIR.
+
+    Keyed on the directory mtime, which changes whenever a history file is
+    added, renamed or removed, so reruns skip the glob and parsing.
+    """
     request_ids = []
-    for file in history_files:
+    for file in CACHE_DIR.glob("quotas_history_*"):
         # Extract timestamp and unique ID from filename
-        filename = file.name
-        if filename.startswith("quotas_history_"):
-            # Format: quotas_history_YYYYMMDDHHMMSS_UNIQUEID.json
-            parts = filename.replace("quotas_history_", "").replace(".json", "").split("_")
-            if len(parts) == 2:
-                timestamp, unique_id = parts
-                request_ids.append({
-                    "id": f"{timestamp}_{unique_id}",
-                    "timestamp": timestamp,
-                    "display": f"{timestamp[:8]}-{timestamp[8:]} (ID: {unique_id})",
-                    "file": file
-                })
+        match = HISTORY_FILE_PATTERN.fullmatch(file.name)
+        if match:
+            timestamp, unique_id = match.groups()
+            request_ids.append({
+                "id": f"{timestamp}_{unique_id}",
+                "timestamp": timestamp,
+                "display": f"{timestamp[:8]}-{timestamp[8:]} (ID: {unique_id})",
+                "file": str(file)
+            })
     
     # Sort by timestamp (newest first)
     request_ids.sort(key=lambda x: x["timestamp"], reverse=True)
     
     return request_ids
+
+def get_request_history_files():
+    """Get list of quota request history files."""
+    mtime_ns = dir_mtime_ns(CACHE_DIR)
+    if mtime_ns is None:
+        return []
+    request_ids = _scan_request_history_files(mtime_ns)
+    for request in request_ids:
+        request["file"] = Path(request["file"])
+    return request_ids
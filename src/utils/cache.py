@@ -2,19 +2,57 @@
 Cache management utilities for the AWS Service Quotas Comparison Tool.
 """
 import json
+import shutil
+import threading
+import time
+import uuid
 from pathlib import Path
+import pandas as pd
 import streamlit as st
 from src.utils.logger import logger
 
+try:
+    import orjson
+except ImportError:  # optional; fall back to the standard library
+    orjson = None
+
 # Create a cache directory if it doesn't exist
 CACHE_DIR = Path("quota_cache")
 CACHE_DIR.mkdir(exist_ok=True)
 
+# Complete quota fetches are also kept in memory per (profile, region) for an
+# hour, so a rerun with the cache option skips reading the Parquet file
+QUOTA_MEMO_TTL = 3600
+_QUOTA_MEMO = {}
+_QUOTA_MEMO_LOCK = threading.Lock()
+
+def remember_quotas(profile_name, region_name, quotas):
+    """Keep a complete quota fetch in memory for QUOTA_MEMO_TTL seconds."""
+    with _QUOTA_MEMO_LOCK:
+        _QUOTA_MEMO[(profile_name, region_name)] = (time.monotonic() + QUOTA_MEMO_TTL, quotas)
+
+def recall_quotas(profile_name, region_name):
+    """Return quotas remembered for a profile and region, or None if missing or expired.
+
+    The same dict is shared by every caller, so treat it as read-only.
+    """
+    with _QUOTA_MEMO_LOCK:
+        entry = _QUOTA_MEMO.get((profile_name, region_name))
+        if entry is None:
+            return None
+        expires_at, quotas = entry
+        if time.monotonic() >= expires_at:
+            del _QUOTA_MEMO[(profile_name, region_name)]
+            return None
+        return quotas
+
 def save_to_cache(data, cache_file):
-    """Save data to cache file."""
+    """Save quota data to a Parquet cache file."""
     try:
-        with open(cache_file, "w") as f:
-            json.dump(data, f)
+        # One row per quota key; columnar storage keeps repeated codes and units small
+        pd.DataFrame.from_dict(data, orient="index").to_parquet(
+            cache_file, compression="snappy"
+        )
         logger.info(f"Cache file saved successfully: {cache_file}")
         return True
     except Exception as e:
@@ -22,26 +60,83 @@ def save_to_cache(data, cache_file):
         return False
 
 def load_from_cache(cache_file):
-    """Load data from cache file."""
+    """Load quota data from a Parquet cache file."""
     try:
-        with open(cache_file, "r") as f:
-            return json.load(f)
+        return pd.read_parquet(cache_file).to_dict(orient="index")
     except Exception as e:
         logger.error(f"Cache read error: {str(e)}")
         return None
 
+def _dumps(data):
+    """Serialise data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        # itertuples yields Python floats, but nullable pandas columns still give numpy scalars
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data).encode()
+
+def _loads(data):
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def write_json(path, data):
+    """Write data to a JSON file."""
+    with open(path, "wb") as f:
+        f.write(_dumps(data))
+
+def read_json(path):
+    """Read a JSON file."""
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+def append_jsonl(f, row):
+    """Append one row to a JSON Lines file opened in binary mode."""
+    f.write(_dumps(row) + b"\n")
+
+def write_jsonl(path, rows):
+    """Write rows to a JSON Lines file, one object per line."""
+    with open(path, "wb") as f:
+        for row in rows:
+            append_jsonl(f, row)
+
+def read_jsonl(path):
+    """Read every row of a JSON Lines file, skipping blank lines."""
+    with open(path, "rb") as f:
+        return [_loads(line) for line in f if line.strip()]
+
 def clear_cache():
     """Clear the quota cache."""
     try:
         logger.info("Clearing quota cache")
-        cache_files = list(CACHE_DIR.glob("quotas_*.json"))
-        logger.info(f"Found {len(cache_files)} cache files to delete")
-        
-        for file in cache_files:
-            logger.debug(f"Deleting cache file: {file}")
-            file.unlink()
+        trash_dir = CACHE_DIR.with_name(f"{CACHE_DIR.name}.trash.{uuid.uuid4().hex}")
+        try:
+            # Swap in an empty directory in one rename and delete the old one in the
+            # background, so the button returns without waiting on every unlink
+            CACHE_DIR.rename(trash_dir)
+            CACHE_DIR.mkdir(exist_ok=True)
+            threading.Thread(
+                target=shutil.rmtree, args=(trash_dir,), kwargs={"ignore_errors": True}, daemon=True
+            ).start()
+            logger.info(f"Moved cache directory to {trash_dir} for background deletion")
+        except OSError as e:
+            # e.g. Windows, where a directory with open files can't be renamed
+            logger.warning(f"Could not move cache directory, deleting files in place: {str(e)}")
+            CACHE_DIR.mkdir(exist_ok=True)
+            # Parquet quota caches, legacy JSON caches and request history files
+            cache_files = list(CACHE_DIR.glob("quotas_*"))
+            logger.info(f"Found {len(cache_files)} cache files to delete")
+            
+            for file in cache_files:
+                logger.debug(f"Deleting cache file: {file}")
+                file.unlink()
             
+        with _QUOTA_MEMO_LOCK:
+            _QUOTA_MEMO.clear()
         st.cache_data.clear()
+        # Imported here because src.aws.quotas imports this module
+        from src.aws.quotas import clear_aws_clients
+        clear_aws_clients()
         logger.info("Cache cleared successfully")
         st.success("Cache cleared successfully!")
         return True
@@ -51,9 +146,18 @@ def clear_cache():
         st.error(error_msg)
         return False
 
-def get_cache_info():
-    """Get information about cached data."""
-    cached_files = list(CACHE_DIR.glob("quotas_*.json"))
+def dir_mtime_ns(path):
+    """Return a directory's mtime in nanoseconds, or None while it is missing."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        # e.g. deleted by hand, or mid-swap in another session's clear_cache
+        return None
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _cache_info_at(cache_dir_mtime_ns):
+    """List cached profile/region names; keyed on CACHE_DIR's mtime so reruns skip the glob."""
+    cached_files = list(CACHE_DIR.glob("quotas_*.parquet"))
     logger.info(f"Found {len(cached_files)} cached quota files")
     
     cache_info = []
@@ -63,3 +167,10 @@ def get_cache_info():
             cache_info.append(name)
     
     return cache_info
+
+def get_cache_info():
+    """Get information about cached data."""
+    mtime_ns = dir_mtime_ns(CACHE_DIR)
+    if mtime_ns is None:
+        return []
+    return _cache_info_at(mtime_ns)
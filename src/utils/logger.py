@@ -2,7 +2,9 @@
 Logger configuration for the AWS Service Quotas Comparison Tool.
 """
 import sys
+import atexit
 import logging
+import logging.handlers
 from pathlib import Path
 import datetime
 
@@ -15,12 +17,27 @@ def setup_logger():
     # Use a single log file per day instead of per session
     log_file = log_dir / f"quota_app_{datetime.datetime.now().strftime('%Y%m%d')}.log"
 
+    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+    # Rotate the file handler and put a memory buffer in front of it, so bulk
+    # operations write the file in batches instead of once per record.
+    # Errors flush the buffer immediately.
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=10_000_000, backupCount=5
+    )
+    file_handler.setFormatter(logging.Formatter(log_format))
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=200, flushLevel=logging.ERROR, target=file_handler
+    )
+    # Write out whatever is still buffered when the process exits
+    atexit.register(buffered_file_handler.flush)
+
     # Set up logging configuration
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
-            logging.FileHandler(log_file),
+            buffered_file_handler,
             logging.StreamHandler(sys.stdout)
         ])
 
@@ -1,9 +1,11 @@
 import sys
 import os
 import unittest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 import pandas as pd
+from botocore.exceptions import ClientError
 import json
+import tempfile
 from pathlib import Path
 
 # Add the parent directory to sys.path to import app.py
@@ -12,10 +14,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import the app module and necessary modules
 import app
 from src.aws.profiles import get_aws_profiles, get_aws_regions
-from src.aws.quotas import fetch_quotas_in_parallel
+from src.aws.quotas import fetch_quotas_in_parallel, fetch_quotas_from_aws, get_sq_client, _session, QuotaFetchIncomplete
+from src.aws.quotas import clear_aws_clients
 from src.aws.comparison import compare_quotas
-from src.ui.quota_request import process_quota_increase_requests, check_quota_request_status
-from src.utils.cache import clear_cache, load_from_cache, save_to_cache
+from src.ui.quota_request import process_quota_increase_requests, check_quota_request_status, _submit_one, _quota_rows
+from src.ui.quota_request import get_request_history_files, _history_file, _read_history, _scan_request_history_files
+from src.ui.quota_request import _needs_status_check
+from src.utils.cache import clear_cache, load_from_cache, save_to_cache, write_json, write_jsonl
 
 class TestApp(unittest.TestCase):
     
@@ -81,7 +86,7 @@ class TestApp(unittest.TestCase):
         with patch('src.aws.quotas.fetch_quotas_from_aws') as mock_fetch, \
              patch('src.aws.quotas.load_from_cache', return_value=None), \
              patch('src.aws.quotas.save_to_cache'), \
-             patch('streamlit.empty'), \
+             patch('streamlit.status'), \
              patch('streamlit.success'), \
              patch('streamlit.info'):
             
@@ -107,6 +112,71 @@ class TestApp(unittest.TestCase):
             mock_fetch.assert_any_call('dest', 'us-east-1')
             self.assertEqual(mock_fetch.call_count, 2)
     
+    def test_fetch_quotas_from_aws_defaults(self):
+        """Test that default values come from one list call per service"""
+        pages = {
+            'list_services': [{'Services': [{'ServiceCode': 'ec2', 'ServiceName': 'EC2'}]}],
+            'list_service_quotas': [{'Quotas': [
+                {'QuotaName': 'Running instances', 'QuotaCode': 'L-1', 'Value': 10.0, 'Adjustable': True},
+                {'QuotaName': 'Elastic IPs', 'QuotaCode': 'L-2', 'Value': 5.0, 'Adjustable': False}
+            ]}],
+            'list_aws_default_service_quotas': [{'Quotas': [{'QuotaCode': 'L-1', 'Value': 5.0}]}]
+        }
+
+        def get_paginator(name):
+            paginator = MagicMock()
+            paginator.paginate.return_value = pages[name]
+            return paginator
+
+        # Sessions and clients are cached; don't reuse mocked ones across tests
+        clear_aws_clients()
+        self.addCleanup(clear_aws_clients)
+        with patch('boto3.Session') as mock_session:
+            client = mock_session.return_value.client.return_value
+            client.get_paginator.side_effect = get_paginator
+
+            quotas = fetch_quotas_from_aws('source', 'us-east-1')
+
+        self.assertEqual(quotas['EC2 - Running instances']['DefaultValue'], 5.0)
+        # Quotas without a listed default fall back to their applied value
+        self.assertEqual(quotas['EC2 - Elastic IPs']['DefaultValue'], 5.0)
+        client.get_aws_default_service_quota.assert_not_called()
+
+        # A service that can't be listed makes the fetch incomplete instead of empty
+        pages['list_service_quotas'] = MagicMock(__iter__=MagicMock(side_effect=ClientError(
+            {'Error': {'Code': 'ThrottlingException'}}, 'ListServiceQuotas'
+        )))
+        with patch('boto3.Session') as mock_session:
+            client = mock_session.return_value.client.return_value
+            client.get_paginator.side_effect = get_paginator
+            clear_aws_clients()
+
+            with self.assertRaises(QuotaFetchIncomplete) as raised:
+                fetch_quotas_from_aws('source', 'us-east-1')
+        self.assertEqual(raised.exception.quotas, {})
+
+    def test_fetch_quotas_incomplete(self):
+        """Test that a fetch with failing services is reported and never cached"""
+        source_quotas = {'EC2 - Running instances': {'Value': 10.0}}
+        failure = QuotaFetchIncomplete('1 of 2 services could not be fetched', source_quotas)
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+             patch('src.aws.quotas.CACHE_DIR', Path(cache_dir)), \
+             patch('src.aws.quotas.fetch_quotas_from_aws', side_effect=failure) as mock_fetch, \
+             patch('src.aws.quotas.save_to_cache') as mock_save, \
+             patch('src.aws.quotas.remember_quotas') as mock_remember, \
+             patch('src.aws.quotas.recall_quotas', return_value=None), \
+             patch('streamlit.status'):
+            result_source, result_dest = fetch_quotas_in_parallel(
+                'source', 'us-east-1', 'dest', 'us-east-1', enable_cache=True
+            )
+
+        # The quotas that were fetched are still shown
+        self.assertEqual(result_source, source_quotas)
+        self.assertEqual(mock_fetch.call_count, 2)
+        mock_save.assert_not_called()
+        mock_remember.assert_not_called()
+
     def test_compare_quotas(self):
         """Test that quotas are compared correctly"""
         # Create mock data that matches the expected format in comparison.py
@@ -168,7 +238,48 @@ class TestApp(unittest.TestCase):
             # Verify the mock was called correctly
             mock_compare.assert_called_once_with(source_quotas, dest_quotas, False)
         mock_compare.assert_called_once_with(source_quotas, dest_quotas, False)
-    
+
+    def test_compare_quotas_suppress_defaults(self):
+        """Test that quotas at their defaults on both sides are suppressed"""
+        def quota(value, default, code):
+            return {
+                'Value': value,
+                'DefaultValue': default,
+                'Unit': 'None',
+                'Adjustable': True,
+                'ServiceCode': 'ec2',
+                'QuotaCode': code
+            }
+
+        source_quotas = {
+            'EC2 - Running instances': quota(10.0, 5.0, 'L-1'),
+            'EC2 - Elastic IPs': quota(5.0, 5.0, 'L-2'),
+            'EC2 - Source only': quota(3.0, 3.0, 'L-3')
+        }
+        dest_quotas = {
+            'EC2 - Running instances': quota(5.0, 5.0, 'L-1'),
+            'EC2 - Elastic IPs': quota(5.0, 5.0, 'L-2'),
+            'EC2 - Destination only': quota(8.0, 2.0, 'L-4')
+        }
+
+        df, source_only_df = compare_quotas(source_quotas, dest_quotas, True)
+
+        # Elastic IPs is at its default in both accounts
+        self.assertEqual(list(df['Quota Name']), ['Destination only', 'Running instances'])
+        self.assertEqual(list(df['Source Value']), ['Not Set', '10.0'])
+        self.assertTrue(pd.isna(df['Delta'].iloc[0]))
+        self.assertEqual(df['Delta'].iloc[1], -5.0)
+        self.assertEqual(list(source_only_df['Quota Name']), ['Source only'])
+
+        # Nothing left once every quota is at its default
+        df, source_only_df = compare_quotas(
+            {'EC2 - Elastic IPs': quota(5.0, 5.0, 'L-2')},
+            {'EC2 - Elastic IPs': quota(5.0, 5.0, 'L-2')},
+            True
+        )
+        self.assertTrue(df.empty)
+        self.assertTrue(source_only_df.empty)
+
     def test_process_quota_increase_requests(self):
         """Test that quota increase requests are processed correctly"""
         # Create a mock for the function
@@ -197,6 +308,60 @@ class TestApp(unittest.TestCase):
             self.assertEqual(result, expected_result)
             mock_process.assert_called_once_with('default', 'us-east-1', selected_quotas)
     
+    def test_submit_one(self):
+        """Test that a quota increase request is turned into a history entry"""
+        row = next(_quota_rows(pd.DataFrame([{
+            'Service': 'EC2',
+            'Quota Name': 'Running instances',
+            'Source Value': 10.0,
+            'Destination Value': 5.0,
+            'ServiceCode': 'ec2',
+            'QuotaCode': 'L-1234'
+        }])))
+        client = MagicMock()
+        client.request_service_quota_increase.return_value = {
+            'RequestedQuota': {
+                'Id': 'req-1',
+                'ServiceName': 'EC2',
+                'QuotaName': 'Running instances',
+                'DesiredValue': 10.0,
+                'QuotaCode': 'L-1234',
+                'Status': 'PENDING'
+            }
+        }
+
+        entry, error = _submit_one(client, row, '20250508000000_1234')
+
+        self.assertIsNone(error)
+        self.assertEqual(entry['RequestedId'], 'req-1')
+        self.assertEqual(entry['Request Status'], 'PENDING')
+        client.request_service_quota_increase.assert_called_once_with(
+            ServiceCode='ec2', QuotaCode='L-1234', DesiredValue=10.0, SupportCaseAllowed=False
+        )
+
+        # Throttling that outlasts the client's retries is reported as a rate limit
+        client.request_service_quota_increase.side_effect = ClientError(
+            {'Error': {'Code': 'ThrottlingException'}}, 'RequestServiceQuotaIncrease'
+        )
+        entry, error = _submit_one(client, row, '20250508000000_1234')
+        self.assertEqual(entry['RequestedId'], 'Failed')
+        self.assertEqual(error, 'Rate limit exceeded')
+
+        # Other client errors are recorded as they are
+        client.request_service_quota_increase.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDeniedException'}}, 'RequestServiceQuotaIncrease'
+        )
+        entry, error = _submit_one(client, row, '20250508000000_1234')
+        self.assertEqual(entry['Request Status'], f'Failed: {error}')
+        self.assertIn('AccessDeniedException', error)
+
+        # A malformed response is recorded as a failure instead of raising
+        client.request_service_quota_increase.side_effect = None
+        client.request_service_quota_increase.return_value = {}
+        entry, error = _submit_one(client, row, '20250508000000_1234')
+        self.assertEqual(entry['RequestedId'], 'Failed')
+        self.assertEqual(entry['QuotaCode'], 'L-1234')
+
     def test_check_quota_request_status(self):
         """Test that quota request status is checked correctly"""
         # Mock the function directly
@@ -216,23 +381,71 @@ class TestApp(unittest.TestCase):
             mock_check.assert_called_once_with('default', 'us-east-1', '1234')
     
     def test_load_from_cache(self):
-        """Test that data is loaded from cache correctly"""
-        # Create mock data
-        mock_data = {'timestamp': '2025-05-08', 'quotas': {'ec2': []}}
-        
-        # Mock the directory path and open function
-        with patch('src.utils.cache.CACHE_DIR', Path('tests/test_cache')), \
-             patch('builtins.open', mock_open(read_data=json.dumps(mock_data))) as mock_file:
-            
-            # Call the function with a test file name
-            result = load_from_cache('cache_file.json')
-            
+        """Test that quota data round-trips through the Parquet cache"""
+        with open('tests/test_cache/quotas_profile1_us-east-1.json') as f:
+            quotas = json.load(f)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = Path(cache_dir) / 'quotas_profile1_us-east-1.parquet'
+            self.assertTrue(save_to_cache(quotas, cache_file))
+
             # Verify results
-            self.assertEqual(result, mock_data)
-            
-            # Check that open was called with the correct path
-            mock_file.assert_called_once_with('cache_file.json', 'r')
-    
+            self.assertEqual(load_from_cache(cache_file), quotas)
+
+        # A missing cache file is reported as a cache miss
+        self.assertIsNone(load_from_cache(Path('tests/test_cache/missing.parquet')))
+
+    def test_clear_cache(self):
+        """Test that clearing the cache also drops cached AWS clients"""
+        self.addCleanup(clear_aws_clients)
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch('src.utils.cache.CACHE_DIR', Path(tmp) / 'quota_cache'), \
+             patch('boto3.Session'), \
+             patch('streamlit.success'):
+            (Path(tmp) / 'quota_cache').mkdir()
+            get_sq_client('source', 'us-east-1')
+            self.assertEqual(get_sq_client.cache_info().currsize, 1)
+
+            self.assertTrue(clear_cache())
+
+        self.assertEqual(get_sq_client.cache_info().currsize, 0)
+        self.assertEqual(_session.cache_info().currsize, 0)
+
+    def test_needs_status_check(self):
+        """Test that only requests that can still change are looked up"""
+        self.assertTrue(_needs_status_check({'RequestedId': 'req-1', 'Request Status': 'PENDING'}))
+        self.assertTrue(_needs_status_check({'RequestedId': 'req-1', 'Request Status': 'CASE_OPENED'}))
+        for status in ('APPROVED', 'DENIED', 'NOT_APPROVED', 'CASE_CLOSED', 'INVALID_REQUEST'):
+            self.assertFalse(_needs_status_check({'RequestedId': 'req-1', 'Request Status': status}))
+        self.assertFalse(_needs_status_check({'RequestedId': 'Skipped', 'Request Status': 'Skipped (Non-adjustable)'}))
+        self.assertFalse(_needs_status_check({'RequestedId': 'Failed', 'Request Status': 'Failed: error'}))
+
+    def test_request_history_files(self):
+        """Test that JSON Lines and legacy JSON history files are both listed and read"""
+        entries = [
+            {'RequestedId': 'req-1', 'Request Status': 'PENDING'},
+            {'RequestedId': 'Skipped', 'Request Status': 'Skipped (Non-adjustable)'}
+        ]
+        _scan_request_history_files.clear()
+        self.addCleanup(_scan_request_history_files.clear)
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+             patch('src.ui.quota_request.CACHE_DIR', Path(cache_dir)):
+            write_jsonl(Path(cache_dir) / 'quotas_history_20250508120000_abcd1234.jsonl', entries)
+            write_json(Path(cache_dir) / 'quotas_history_20250501120000_12345678.json', entries[:1])
+
+            request_ids = get_request_history_files()
+            self.assertEqual(
+                [req['id'] for req in request_ids],
+                ['20250508120000_abcd1234', '20250501120000_12345678']
+            )
+            self.assertEqual(_read_history(_history_file('20250508120000_abcd1234')), entries)
+            self.assertEqual(_read_history(_history_file('20250501120000_12345678')), entries[:1])
+
+        # A missing cache directory lists nothing instead of raising
+        with patch('src.ui.quota_request.CACHE_DIR', Path(cache_dir)):
+            self.assertEqual(get_request_history_files(), [])
+
     def test_main_function(self):
         """Test that the main function exists in app.py"""
         self.assertTrue(hasattr(app, 'main'), "app.py should have a main function")